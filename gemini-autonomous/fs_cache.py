@@ -0,0 +1,97 @@
+import os
+import mmap
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+# Files above this size are decoded straight from a read-only mapping
+MMAP_THRESHOLD = 64 * 1024
+# Files modified more recently than this are read but not cached: a same-size rewrite within
+# the filesystem's timestamp granularity would leave the file version unchanged
+MIN_CACHE_AGE_NS = 1_000_000_000
+
+class FSCache:
+    """
+    Process-wide cache of project file contents, keyed by (mtime_ns, ctime_ns, inode, size).
+    Shared by build_context() and the codebase scan, so a file read once (e.g. by
+    generate_spec) is served from memory until it changes on disk.
+    """
+
+    def __init__(self, project_dir: Path):
+        self.project_dir = project_dir.resolve()
+        self._root = str(self.project_dir)
+        self._prefix = self._root + os.sep
+        self._entries: Dict[str, Tuple[Tuple[int, int, int, int], str]] = {}  # abs path -> (version, content)
+
+    def _abs(self, path: Union[str, Path]) -> str:
+        return os.path.normpath(os.path.join(self.project_dir, path))
+
+    def _is_inside(self, real_path: str) -> bool:
+        """Same containment test as ToolManager._is_safe_path: realpath + commonpath."""
+        try:
+            return os.path.commonpath([real_path, self._root]) == self._root
+        except ValueError:
+            return False
+
+    def scandir(self, path: Union[str, Path] = ".") -> List[os.DirEntry]:
+        """List a directory (relative to the project root) as DirEntry objects, or [] if unreadable."""
+        try:
+            with os.scandir(self._abs(path)) as entries:
+                return list(entries)
+        except OSError:
+            return []
+
+    def lookup(self, path: Union[str, Path], stat: os.stat_result) -> Optional[str]:
+        """Return the cached text if it is still current for `stat`, else None (no I/O)."""
+        cached = self._entries.get(self._abs(path))
+        if cached and cached[0] == self._version(stat):
+            return cached[1]
+        return None
+
+    @staticmethod
+    def _version(stat: os.stat_result) -> Tuple[int, int, int, int]:
+        return (stat.st_mtime_ns, stat.st_ctime_ns, stat.st_ino, stat.st_size)
+
+    def read(self, path: Union[str, Path], stat: Optional[os.stat_result] = None) -> Optional[str]:
+        """
+        Return the text of a file inside the project, or None if it cannot be read.
+        Pass `stat` when the caller already has it (e.g. from a DirEntry) to skip the stat call.
+        """
+        abs_path = self._abs(path)
+        if not abs_path.startswith(self._prefix):
+            return None
+        try:
+            if stat is None:
+                stat = os.stat(abs_path)
+            cached = self.lookup(abs_path, stat)
+            if cached is not None:
+                return cached
+
+            # The file or any parent directory may be a symlink out of the project, so resolve
+            # the whole path before reading (cache hits were already checked when cached)
+            if not self._is_inside(os.path.realpath(abs_path)):
+                return None
+
+            content = self._read_uncached(abs_path)
+        except OSError:
+            return None
+
+        if time.time_ns() - stat.st_mtime_ns >= MIN_CACHE_AGE_NS:
+            self._entries[abs_path] = (self._version(stat), content)
+        else:
+            self._entries.pop(abs_path, None)
+        return content
+
+    @staticmethod
+    def _read_uncached(abs_path: str) -> str:
+        # Raw read + one decode instead of the text-layer stack
+        with open(abs_path, 'rb', buffering=0) as f:
+            if os.fstat(f.fileno()).st_size > MMAP_THRESHOLD:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    content = str(mm, 'utf-8', 'ignore')
+            else:
+                content = f.read().decode('utf-8', 'ignore')
+        # Match text-mode universal newlines
+        if '\r' in content:
+            content = content.replace('\r\n', '\n').replace('\r', '\n')
+        return content
@@ -9,15 +9,22 @@ Handles authentication, context building, and the main execution loop.
 import os
 import sys
 import argparse
+import functools
+import hashlib
+import re
+import selectors
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Optional
+from typing import Deque, Dict, List, Optional, Tuple
 
 import google.generativeai as genai
 from google.auth import default
 from google.auth.transport.requests import Request
 
 from gemini_tools import ToolManager
+from fs_cache import FSCache
 from rate_limiter import RateLimiter
 from git_manager import GitManager
 from readme_parser import ReadmeParser
@@ -30,6 +37,54 @@ DEFAULT_MODEL = "gemini-3-pro-preview"
 # This allows for very long sessions while still preventing infinite loops from consuming the entire quota.
 MAX_CONTEXT_TOKENS = 500000 
 
+# Key files injected into every prompt, in a fixed order.
+# The order and truncation must stay deterministic so the prompt prefix is byte-identical
+# across turns, which is what Gemini's implicit prompt caching keys on.
+CONTEXT_KEY_FILES = (
+    "planning_journal.md", # Priority 1: Persistent Memory
+    "TECH_STACK.md",       # Priority 2: Technical Constitution
+    "feature_list.json",
+    "app_spec.txt",
+    "package.json",
+    "requirements.txt",
+    "init.sh",
+    "README.md",
+)
+KEY_FILE_CHAR_LIMIT = 10000
+TRUNCATION_MARKER = "\n... (truncated)"
+
+# The session token count is tracked from response usage metadata; count_tokens (an extra
+# API round-trip) is only used as a sanity check. The check interval starts at
+# TOKEN_RECOUNT_MIN_INTERVAL iterations and doubles (up to the max) every time the local
+# estimate turns out accurate; near the limit it runs every iteration.
+TOKEN_RECOUNT_MIN_INTERVAL = 8
+TOKEN_RECOUNT_MAX_INTERVAL = 64
+TOKEN_RECOUNT_NEAR_LIMIT_RATIO = 0.7
+TOKEN_RECOUNT_TOLERANCE = 0.1 # Relative drift still considered accurate
+
+# Rolling eviction: past this fraction of MAX_CONTEXT_TOKENS the oldest turns are dropped
+# one at a time (keeping the first PINNED_TURNS) instead of waiting for a full rotation.
+HISTORY_EVICTION_RATIO = 0.8
+PINNED_TURNS = 1
+
+# Worker threads for reading changed key files in build_context()
+KEY_FILE_READ_WORKERS = 4
+
+# Worker threads for the codebase scan (stat + read are I/O bound, so threads overlap the waits)
+SCAN_WORKERS = 32
+
+# Codebase scan filters, built once at import time
+RELEVANT_EXT = frozenset({
+    '.py', '.js', '.jsx', '.ts', '.tsx', '.html', '.css', '.scss', 
+    '.sql', '.md', '.json', '.ini', '.yml', '.yaml', '.toml', 
+    '.dockerfile', '.sh', '.txt'
+})
+IGNORE_DIRS = frozenset({
+    '.git', '__pycache__', 'node_modules', 'venv', 'env', '.idea', 
+    '.vscode', 'dist', 'build', 'coverage', 'tmp', 'temp', 'migrations'
+})
+SPECIAL_FILES = frozenset({'Dockerfile', 'Makefile', 'Gemfile'})
+
 SYSTEM_INSTRUCTION = """
 You are an expert Autonomous AI Software Engineer.
 Your goal is to complete the project specified in `app_spec.txt` by implementing features in `feature_list.json`.
@@ -111,6 +166,29 @@ class GeminiRunner:
         self.model_name = model_name
         self.mode = mode
         
+        # Context Cache: skip re-reading unchanged files on every iteration.
+        # Shared by build_context() and _scan_project_codebase() (generate_spec).
+        self._fs_cache = FSCache(self.project_dir)
+        self._tree_cache: Optional[Tuple[int, str]] = None  # (project_dir mtime_ns, listing)
+        
+        # Delta Context: sha1 of each context section last sent in this chat session.
+        # Empty means the next turn must send the full context (new session).
+        self._last_sent_snapshot: Dict[str, str] = {}
+        # Turn number (0-based, per session) whose prompt last carried each section's content,
+        # and the oldest unpinned turn still in the history, so eviction can tell which
+        # sections the model can no longer see.
+        self._section_sent_turn: Dict[str, int] = {}
+        self._turn_number = 0
+        self._first_live_turn = PINNED_TURNS
+        
+        # Local token estimate for the current chat session (see _update_token_estimate)
+        self._token_estimate = 0
+        self._recount_interval = TOKEN_RECOUNT_MIN_INTERVAL
+        self._iterations_since_recount = 0
+        
+        # Loop Detection: signatures of the last 3 tool calls, recorded as the tools run
+        self._recent_tool_calls: Deque[Tuple[str, str]] = deque(maxlen=3)
+        
         # Initialize Rate Limiter
         self.rate_limiter = RateLimiter(project_dir, max_rpd, max_tpm)
         
@@ -131,20 +209,41 @@ class GeminiRunner:
         # Create list of callable tools for automatic execution
         # The SDK will generate schemas from the function signatures and docstrings
         self.tools_list = [
-            self.tool_manager.execute_bash,
-            self.tool_manager.read_file,
-            self.tool_manager.write_file,
-            self.tool_manager.replace_in_file,
-            self.tool_manager.list_directory,
-            self.tool_manager.search_codebase
+            self._track_tool_call(tool) for tool in (
+                self.tool_manager.execute_bash,
+                self.tool_manager.read_file,
+                self.tool_manager.read_files,
+                self.tool_manager.write_file,
+                self.tool_manager.replace_in_file,
+                self.tool_manager.list_directory,
+                self.tool_manager.search_codebase
+            )
         ]
         
+        # The model (system instruction + tool schemas) is built once and shared by every chat
+        # session, so the request prefix stays byte-identical across session rotations and
+        # Gemini's implicit prompt caching can serve it.
+        # Explicit CachedContent is not used: a model created from cached content cannot also
+        # register local tools, which automatic function calling needs to execute them.
         self.model = genai.GenerativeModel(
             model_name=self.model_name,
             tools=self.tools_list,
             system_instruction=SYSTEM_INSTRUCTION
         )
+        self._start_chat()
+
+    def _start_chat(self):
+        """
+        Start a fresh chat session on the shared model and reset all per-session state.
+        """
         self.chat = self.model.start_chat(enable_automatic_function_calling=True)
+        self._last_sent_snapshot = {}
+        self._section_sent_turn = {}
+        self._turn_number = 0
+        self._first_live_turn = PINNED_TURNS
+        self._token_estimate = 0
+        self._iterations_since_recount = 0
+        self._recent_tool_calls.clear()
 
     def _startup_verification(self):
         """
@@ -268,53 +367,153 @@ class GeminiRunner:
                 print(f"Auth Error: {e}")
                 raise ValueError("Please set GEMINI_API_KEY environment variable.")
 
-    def build_context(self) -> str:
+    def _read_key_files(self) -> Dict[str, str]:
         """
-        Build the current project context (file tree + key files).
+        Read the key files present in the project root, keyed by filename.
+        One scandir finds them all; files whose mtime and size are unchanged come from the
+        cache and the rest are read concurrently.
         """
-        context = ["# Project Context\n"]
+        present = [entry for entry in self._fs_cache.scandir() if entry.name in CONTEXT_KEY_FILES and entry.is_file()]
+        
+        contents = {}
+        misses = []
+        for entry in present:
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            cached = self._fs_cache.lookup(entry.name, stat)
+            if cached is not None:
+                contents[entry.name] = cached
+            else:
+                misses.append((entry.name, stat))
+        
+        if misses:
+            if len(misses) == 1:
+                results = [self._fs_cache.read(*misses[0])]
+            else:
+                with ThreadPoolExecutor(max_workers=KEY_FILE_READ_WORKERS) as executor:
+                    results = list(executor.map(lambda miss: self._fs_cache.read(*miss), misses))
+            
+            for (filename, _), content in zip(misses, results):
+                if content is not None:
+                    contents[filename] = content
         
+        return contents
+
+    def _cached_tree(self) -> str:
+        """
+        List the project root, reusing the cached listing while the directory is unchanged.
+        Adding, removing or renaming an entry bumps the directory's mtime.
+        """
+        mtime_ns = self.project_dir.stat().st_mtime_ns
+        if self._tree_cache and self._tree_cache[0] == mtime_ns:
+            return self._tree_cache[1]
+        
+        listing = self.tool_manager.list_directory(".")
+        self._tree_cache = (mtime_ns, listing)
+        return listing
+
+    def _context_sections(self) -> Dict[str, str]:
+        """
+        Collect the context blocks shown to the model (file tree + key files), in prompt order.
+        """
         # 1. File Tree
-        context.append("## Directory Structure")
-        context.append("```")
         # Use ToolManager's list_directory to respect security and ignores
-        context.append(self.tool_manager.list_directory("."))
-        context.append("```\n")
+        sections = {"Directory Structure": self._cached_tree()}
         
         # 2. Key Files Content
         # We automatically include specific high-value files if they exist
-        key_files = [
-            "planning_journal.md", # Priority 1: Persistent Memory
-            "TECH_STACK.md",       # Priority 2: Technical Constitution
-            "feature_list.json",
-            "app_spec.txt",
-            "package.json",
-            "requirements.txt",
-            "init.sh",
-            "README.md"
-        ]
+        key_files = self._read_key_files()
+        for filename in CONTEXT_KEY_FILES:
+            content = key_files.get(filename)
+            if content is not None:
+                content = content.rstrip()
+                # Truncate very large files to avoid wasting token budget on static content
+                # But keep feature_list.json full as it's the source of truth
+                if filename != "feature_list.json" and len(content) > KEY_FILE_CHAR_LIMIT:
+                    content = content[:KEY_FILE_CHAR_LIMIT] + TRUNCATION_MARKER
+                sections[filename] = content
+        
+        return sections
+
+    @staticmethod
+    def _snapshot(sections: Dict[str, str]) -> Dict[str, str]:
+        """Hash each context section so later turns can tell what changed."""
+        return {name: hashlib.sha1(content.encode('utf-8')).hexdigest() for name, content in sections.items()}
+
+    def build_context(self, sections: Optional[Dict[str, str]] = None) -> str:
+        """
+        Build the current project context (file tree + key files).
+        """
+        if sections is None:
+            sections = self._context_sections()
+        
+        context = ["# Project Context\n"]
+        context.append("## Directory Structure")
+        context.append("```")
+        context.append(sections["Directory Structure"])
+        context.append("```\n")
         
         context.append("## Key Files")
-        for filename in key_files:
-            # Check if file exists before trying to read
-            if (self.project_dir / filename).exists():
-                content = self.tool_manager.read_file(filename)
-                if not content.startswith("Error"):
-                    context.append(f"### {filename}")
-                    context.append("```")
-                    # Truncate very large files to avoid wasting token budget on static content
-                    # But keep feature_list.json full as it's the source of truth
-                    if filename == "feature_list.json":
-                        context.append(content)
-                    else:
-                        context.append(content[:10000] + ("\n... (truncated)" if len(content) > 10000 else ""))
-                    context.append("```\n")
+        for filename in CONTEXT_KEY_FILES:
+            if filename in sections:
+                context.append(f"### {filename}")
+                context.append("```")
+                context.append(sections[filename])
+                context.append("```\n")
                 
         return "\n".join(context)
 
+    def build_context_delta(self, sections: Dict[str, str]) -> str:
+        """
+        Build only the parts of the project context that changed since the last sent turn.
+        The full context is already in the chat history, so resending it is wasted tokens.
+        """
+        snapshot = self._snapshot(sections)
+        changed = [name for name, digest in snapshot.items() if self._last_sent_snapshot.get(name) != digest]
+        removed = [name for name in self._last_sent_snapshot if name not in snapshot]
+        
+        context = ["# Project Context (Delta since last turn)\n"]
+        if not changed and not removed:
+            context.append("No changes to the directory structure or key files since your last turn.")
+            return "\n".join(context)
+        
+        if "Directory Structure" in changed:
+            context.append("## Directory Structure")
+            context.append("```")
+            context.append(sections["Directory Structure"])
+            context.append("```\n")
+        
+        changed_files = [name for name in changed if name != "Directory Structure"]
+        if changed_files:
+            context.append("## Changed Key Files")
+            for filename in changed_files:
+                context.append(f"### {filename}")
+                context.append("```")
+                context.append(sections[filename])
+                context.append("```\n")
+        
+        if removed:
+            context.append("## Removed Key Files")
+            context.extend(f"- {filename}" for filename in removed)
+        
+        return "\n".join(context)
+
+    def _record_sent_sections(self, snapshot: Dict[str, str]):
+        """Remember which turn carried each section that this turn's prompt (re)sent."""
+        for name, digest in snapshot.items():
+            if self._last_sent_snapshot.get(name) != digest:
+                self._section_sent_turn[name] = self._turn_number
+        for name in list(self._section_sent_turn):
+            if name not in snapshot:
+                del self._section_sent_turn[name]
+        self._last_sent_snapshot = snapshot
+        self._turn_number += 1
+
     def _get_token_count(self, history) -> int:
         """
-        Estimate token count for the current session history.
+        Count tokens for the current session history (API round-trip).
         """
         try:
             return self.model.count_tokens(history).total_tokens
@@ -322,6 +521,80 @@ class GeminiRunner:
             # Fallback estimation if API fails
             return 0
 
+    def _update_token_estimate(self, prompt: str, response) -> None:
+        """
+        Update the session token estimate after a turn.
+        The response's usage metadata already reports the full prompt (history) plus output,
+        so no separate count_tokens call is needed.
+        """
+        usage = getattr(response, "usage_metadata", None)
+        total = getattr(usage, "total_token_count", 0) if usage else 0
+        if total:
+            self._token_estimate = total
+        else:
+            # Fallback estimation (~4 chars per token)
+            self._token_estimate += (len(prompt) + len(response.text)) // 4
+
+    def _maybe_recount_tokens(self):
+        """
+        Correct the local token estimate with an exact count_tokens call, adaptively:
+        rarely while the estimate keeps matching, every iteration close to the limit.
+        """
+        self._iterations_since_recount += 1
+        near_limit = self._token_estimate >= TOKEN_RECOUNT_NEAR_LIMIT_RATIO * MAX_CONTEXT_TOKENS
+        if not near_limit and self._iterations_since_recount < self._recount_interval:
+            return
+        
+        self._iterations_since_recount = 0
+        counted = self._get_token_count(self.chat.history)
+        if not counted:
+            return # API failed or empty history; keep the estimate
+        
+        drift = abs(counted - self._token_estimate)
+        if drift <= TOKEN_RECOUNT_TOLERANCE * counted:
+            self._recount_interval = min(self._recount_interval * 2, TOKEN_RECOUNT_MAX_INTERVAL)
+        else:
+            self._recount_interval = TOKEN_RECOUNT_MIN_INTERVAL
+        self._token_estimate = counted
+
+    def _evict_old_turns(self):
+        """
+        Drop the oldest unpinned turns while the session is above the eviction threshold.
+        A turn is one of our text prompts plus every function call/response message that
+        followed it, so tool-call pairs are never split.
+        """
+        threshold = HISTORY_EVICTION_RATIO * MAX_CONTEXT_TOKENS
+        if self._token_estimate <= threshold:
+            return
+        
+        history = list(self.chat.history)
+        dropped = 0
+        while self._token_estimate > threshold:
+            turn_starts = [
+                i for i, content in enumerate(history)
+                if content.role == "user" and any(part.text for part in content.parts)
+            ]
+            # Always keep the pinned turns and the latest turn
+            if len(turn_starts) <= PINNED_TURNS + 1:
+                break
+            begin, end = turn_starts[PINNED_TURNS], turn_starts[PINNED_TURNS + 1]
+            # Rough size of the dropped turn (~4 chars per token)
+            self._token_estimate -= sum(len(str(content)) for content in history[begin:end]) // 4
+            del history[begin:end]
+            dropped += 1
+        
+        if dropped:
+            self.chat.history = history
+            # Sections whose content was last sent in an evicted turn are forgotten, so the next
+            # delta resends just those; everything else is still in the history
+            evicted_end = self._first_live_turn + dropped
+            for name, turn in list(self._section_sent_turn.items()):
+                if self._first_live_turn <= turn < evicted_end:
+                    del self._section_sent_turn[name]
+                    self._last_sent_snapshot.pop(name, None)
+            self._first_live_turn = evicted_end
+            print(f"\n[Context] Evicted {dropped} oldest turns (~{self._token_estimate} tokens remain).")
+
     def _retry_with_backoff(self, func, *args, **kwargs):
         """
         Execute a function with exponential backoff retry logic.
@@ -346,11 +619,16 @@ class GeminiRunner:
         """
         print(f"{prompt} (Auto-proceeding in {timeout}s... Press Enter to intervene)", end='', flush=True)
         
-        # Unix-only implementation using select
-        import select
-        import sys
+        # Piped / non-interactive stdin: nobody can answer, and a select on it would report
+        # EOF as "ready" immediately, so proceed without waiting.
+        if not sys.stdin.isatty():
+            print("\n[Auto-proceeding]")
+            return None
+        
+        with selectors.DefaultSelector() as selector:
+            selector.register(sys.stdin, selectors.EVENT_READ)
+            ready = selector.select(timeout)
         
-        ready, _, _ = select.select([sys.stdin], [], [], timeout)
         if ready:
             print() # Newline
             return sys.stdin.readline().strip()
@@ -358,32 +636,28 @@ class GeminiRunner:
         print("\n[Auto-proceeding]")
         return None
 
+    def _track_tool_call(self, tool):
+        """
+        Wrap a tool so every call records its signature for loop detection.
+        functools.wraps keeps the name, docstring and signature the SDK builds the schema from.
+        """
+        @functools.wraps(tool)
+        def wrapper(*args, **kwargs):
+            # Signature: name + sorted args
+            arg_str = sorted([(k, str(v)) for k, v in kwargs.items()])
+            self._recent_tool_calls.append((tool.__name__, str(args) + str(arg_str)))
+            return tool(*args, **kwargs)
+        return wrapper
+
     def _detect_loop(self) -> str:
         """
         Check for repetitive tool usage in recent history.
         Returns an intervention message if a loop is detected, else None.
         """
-        # Look at the last 10 messages
-        history = self.chat.history[-10:]
-        tool_calls = []
-        
-        for message in history:
-            if hasattr(message, 'parts'):
-                for part in message.parts:
-                    if hasattr(part, 'function_call') and part.function_call:
-                        # Create a signature: name + sorted args
-                        fc = part.function_call
-                        args = dict(fc.args)
-                        # Convert args to a hashable string representation
-                        arg_str = sorted([(k, str(v)) for k, v in args.items()])
-                        signature = (fc.name, str(arg_str))
-                        tool_calls.append(signature)
-        
         # Check for 3 consecutive identical calls
-        if len(tool_calls) >= 3:
-            last_three = tool_calls[-3:]
-            if last_three[0] == last_three[1] == last_three[2]:
-                return f"\nSYSTEM INTERVENTION: You have executed the tool '{last_three[0][0]}' with identical arguments 3 times in a row. STOP. This strategy is not working. Analyze WHY it failed and try a DIFFERENT approach."
+        calls = self._recent_tool_calls
+        if len(calls) == 3 and calls[0] == calls[1] == calls[2]:
+            return f"\nSYSTEM INTERVENTION: You have executed the tool '{calls[0][0]}' with identical arguments 3 times in a row. STOP. This strategy is not working. Analyze WHY it failed and try a DIFFERENT approach."
         
         return None
 
@@ -404,7 +678,8 @@ class GeminiRunner:
             print(f"\n[Iteration {iteration}] Observing...")
             
             # 1. Check Token Usage (Physical Sharding)
-            current_tokens = self._get_token_count(self.chat.history)
+            self._maybe_recount_tokens()
+            current_tokens = self._token_estimate
             print(f"Current Context Tokens: {current_tokens} / {MAX_CONTEXT_TOKENS}")
             
             # Rate Limit Check (Pre-flight)
@@ -423,68 +698,63 @@ class GeminiRunner:
                 # 3. The next iteration will rebuild context from the file system.
                 
                 print("Resetting Chat Session...")
-                self.chat = self.model.start_chat(enable_automatic_function_calling=True)
+                self._start_chat()
                 print("Session Rotated. Resuming with fresh context.")
                 continue
 
             # 2. Observe
-            context = self.build_context()
+            # Full context on the first turn of a session, then only what changed since.
+            sections = self._context_sections()
+            if self._last_sent_snapshot:
+                prompt = f"Here is what changed in the project state:\n\n{self.build_context_delta(sections)}"
+            else:
+                prompt = f"Here is the current project state:\n\n{self.build_context(sections)}"
             
             # 3. Think & Act
-            prompt = f"""
-            Here is the current project state:
-            
-            {context}
-            
-            Please analyze the `planning_journal.md` and `feature_list.json` and execute the next necessary steps.
-            If all tasks are completed, output "TASK_COMPLETE".
-            """
+            # The large, mostly static context goes first and the volatile instructions last,
+            # so consecutive prompts share the longest possible prefix (implicit prompt caching).
+            volatile = []
             
             # Loop Detection
             loop_warning = self._detect_loop()
             if loop_warning:
                 print(f"\n[Loop Detected] Injecting intervention: {loop_warning}")
-                prompt += f"\n\n{loop_warning}\n"
+                volatile.append(loop_warning.strip())
             
             # Interactive Feedback Injection (Optional, for Legacy Mode mostly)
             if self.mode == "legacy":
                  user_feedback = self._input_with_timeout("\n[Interactive] Type feedback:", timeout=10)
                  if user_feedback:
                      print(f"Feedback received: {user_feedback}")
-                     prompt += f"\n\nUSER FEEDBACK (CRITICAL): {user_feedback}\n"
+                     volatile.append(f"USER FEEDBACK (CRITICAL): {user_feedback}")
+            
+            volatile.append(
+                "Please analyze the `planning_journal.md` and `feature_list.json` and execute the next necessary steps.\n"
+                "If all tasks are completed, output \"TASK_COMPLETE\"."
+            )
+            prompt += "\n\n## Current Turn\n" + "\n\n".join(volatile)
 
             try:
-                # Spinner logic
-                import threading
-                import itertools
-                
-                spinner = itertools.cycle(['-', '/', '|', '\\'])
-                stop_spinner = False
-                
-                def spin():
-                    while not stop_spinner:
-                        sys.stdout.write(next(spinner))
-                        sys.stdout.flush()
-                        time.sleep(0.1)
-                        sys.stdout.write('\b')
-                
-                print("Thinking...", end=' ', flush=True)
-                t = threading.Thread(target=spin)
-                t.start()
+                # Plain progress indicator: a spinner thread would write to stdout concurrently
+                # with the tool output printed during automatic function calling.
+                print("Thinking...", end='', flush=True)
                 
                 try:
                     # Send the prompt to Gemini with exponential backoff
                     # Note: We keep stream=False to ensure automatic_function_calling works reliably
                     response = self._retry_with_backoff(self.chat.send_message, prompt)
                     
+                    # The model has now seen this state; the next turn only needs the delta
+                    self._record_sent_sections(self._snapshot(sections))
+                    
                     # Record successful request
                     # Estimate output tokens (response length / 4)
                     output_tokens = len(response.text) // 4
                     self.rate_limiter.record_request(estimated_input_tokens + output_tokens)
+                    self._update_token_estimate(prompt, response)
+                    self._evict_old_turns()
                     
                 finally:
-                    stop_spinner = True
-                    t.join()
                     print(" Done.")
                 
                 # Print the model's text response
@@ -529,33 +799,33 @@ class GeminiRunner:
         CHAR_BUDGET = 400000 
         current_chars = 0
         
-        # Define relevant extensions and ignore patterns
-        relevant_extensions = {
-            '.py', '.js', '.jsx', '.ts', '.tsx', '.html', '.css', '.scss', 
-            '.sql', '.md', '.json', '.ini', '.yml', '.yaml', '.toml', 
-            '.dockerfile', '.sh', '.txt'
-        }
-        ignore_dirs = {
-            '.git', '__pycache__', 'node_modules', 'venv', 'env', '.idea', 
-            '.vscode', 'dist', 'build', 'coverage', 'tmp', 'temp', 'migrations'
-        }
-        
-        file_list = []
+        def walk(root: str):
+            # os.scandir yields DirEntry objects whose file type comes from readdir, so telling
+            # files from directories needs no extra stat; ignored directories are pruned here.
+            for entry in self._fs_cache.scandir(root):
+                if entry.is_dir():
+                    if entry.name not in IGNORE_DIRS and not entry.is_symlink():
+                        yield from walk(entry.path)
+                else:
+                    yield entry
         
         # 1. Scan and collect metadata
-        for root, dirs, files in os.walk(self.project_dir):
-            dirs[:] = [d for d in dirs if d not in ignore_dirs]
-            
-            for file in files:
-                file_path = Path(root) / file
-                if file_path.suffix.lower() in relevant_extensions or file in {'Dockerfile', 'Makefile', 'Gemfile'}:
-                    try:
-                        stat = file_path.stat()
-                        if stat.st_size > 100000: # Skip huge files
-                            continue
-                        file_list.append((file_path, stat.st_size))
-                    except Exception:
-                        pass
+        candidates = [
+            entry for entry in walk(str(self.project_dir))
+            if entry.name in SPECIAL_FILES or os.path.splitext(entry.name)[1].lower() in RELEVANT_EXT
+        ]
+        
+        def stat_one(entry: os.DirEntry):
+            try:
+                return Path(entry.path), entry.stat()
+            except Exception:
+                return None, None
+        
+        with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as executor:
+            file_list = [
+                (file_path, stat) for file_path, stat in executor.map(stat_one, candidates)
+                if stat is not None and stat.st_size <= 100000 # Skip huge files
+            ]
         
         # 2. Prioritize Files
         # Priority: 
@@ -568,50 +838,51 @@ class GeminiRunner:
         context_parts = []
         
         # 1. Inject README.md as Master Plan (RDD)
-        readme_path = self.project_dir / "README.md"
-        if readme_path.exists():
-            readme_content = readme_path.read_text(encoding='utf-8')
+        readme_content = self._fs_cache.read("README.md")
+        if readme_content is not None:
             context_parts.append(f"=== PROJECT MASTER PLAN (README.md) ===\n{readme_content}\n")
             print("Loaded Master Plan from README.md")
         
         # 2. Add TECH_STACK.md if exists
-        tech_stack_path = self.project_dir / "TECH_STACK.md"
-        if tech_stack_path.exists():
-            context_parts.append(f"=== TECH STACK ===\n{tech_stack_path.read_text(encoding='utf-8')}\n")
+        tech_stack_content = self._fs_cache.read("TECH_STACK.md")
+        if tech_stack_content is not None:
+            context_parts.append(f"=== TECH STACK ===\n{tech_stack_content}\n")
             
         # 3. Add planning_journal.md (The Agent's Memory)
         # Extract keywords from planning_journal.md
         keywords = set()
-        journal_path = self.project_dir / "planning_journal.md"
-        if journal_path.exists():
-            try:
-                content = journal_path.read_text().lower()
-                # Simple keyword extraction: look for words in "Next Steps" or "Current Status"
-                # For now, we just grab common technical terms if they appear in the journal
-                common_terms = ['auth', 'login', 'database', 'api', 'test', 'docker', 'config', 'utils', 'model', 'view', 'controller']
-                for term in common_terms:
-                    if term in content:
-                        keywords.add(term)
-            except Exception:
-                pass
+        journal_content = self._fs_cache.read("planning_journal.md")
+        if journal_content is not None:
+            content = journal_content.lower()
+            # Simple keyword extraction: look for words in "Next Steps" or "Current Status"
+            # For now, we just grab common technical terms if they appear in the journal
+            common_terms = ['auth', 'login', 'database', 'api', 'test', 'docker', 'config', 'utils', 'model', 'view', 'controller']
+            for term in common_terms:
+                if term in content:
+                    keywords.add(term)
+        
+        # One precompiled alternation instead of a substring scan per keyword
+        keyword_re = re.compile("|".join(map(re.escape, sorted(keywords)))) if keywords else None
+        source_dirs = frozenset({'app', 'src'})
+        test_dirs = frozenset({'tests', 'test'})
         
         def get_priority(path: Path):
-            parts = path.parts
-            filename = path.name.lower()
+            # Classify by the path relative to the project root, not the absolute path
+            rel_path = path.relative_to(self.project_dir)
+            parts = rel_path.parts
             
             # Level 0: Root configs
-            if len(parts) == 2: return 0 
+            if len(parts) == 1: return 0 
             
             # Level 1: Smart Context Matches
-            for kw in keywords:
-                if kw in filename or kw in str(path).lower():
-                    return 1
+            if keyword_re and keyword_re.search(str(rel_path).lower()):
+                return 1
             
             # Level 2: Source
-            if 'app' in parts or 'src' in parts: return 2
+            if not source_dirs.isdisjoint(parts): return 2
             
             # Level 3: Tests
-            if 'tests' in parts or 'test' in parts: return 3
+            if not test_dirs.isdisjoint(parts): return 3
             
             # Level 4: Default
             return 4
@@ -624,13 +895,25 @@ class GeminiRunner:
         
         file_count = 0
         
-        for file_path, size in file_list:
-            if current_chars + size > CHAR_BUDGET:
-                context.append(f"### [SKIPPED] {file_path.name} (Context Budget Exceeded)")
-                continue
-                
-            try:
-                content = file_path.read_text(encoding='utf-8', errors='ignore')
+        # Decide what fits the budget from the on-disk sizes first (decoded length never
+        # exceeds the byte size), so the selected files can be read concurrently.
+        # file_list is sorted by priority, so once a file does not fit, everything after it is
+        # lower priority: stop there instead of walking (and listing) the rest.
+        selected = []
+        planned_chars = 0
+        for file_path, stat in file_list:
+            if planned_chars + stat.st_size > CHAR_BUDGET:
+                break
+            selected.append((file_path, stat))
+            planned_chars += stat.st_size
+        skipped_count = len(file_list) - len(selected)
+        
+        with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as executor:
+            # executor.map keeps input order, so results line up with selected.
+            # Reads go through the shared cache, so files already loaded this process are free.
+            for (file_path, _), content in zip(selected, executor.map(lambda item: self._fs_cache.read(*item), selected)):
+                if content is None:
+                    continue
                 rel_path = file_path.relative_to(self.project_dir)
                 
                 context.append(f"### File: {rel_path}")
@@ -640,12 +923,13 @@ class GeminiRunner:
                 
                 current_chars += len(content)
                 file_count += 1
-            except Exception:
-                pass
+        
+        if skipped_count:
+            context.append(f"### [SKIPPED {skipped_count} lower-priority files] (Context Budget Exceeded)")
         
         print(f"Scanned {file_count} files ({current_chars/1024:.1f} KB) for context.")
-        if current_chars >= CHAR_BUDGET:
-            print(f"[WARNING] Context budget reached. Some files were skipped.")
+        if skipped_count:
+            print(f"[WARNING] Context budget reached. {skipped_count} files were skipped.")
             
         return "\n".join(context)
 
@@ -682,12 +966,30 @@ class GeminiRunner:
         
         try:
             print("Analyzing code and generating spec (this may take a minute)...")
-            response = self._retry_with_backoff(self.chat.send_message, prompt)
+            # Stream the spec so it shows up as it is generated instead of after the whole reply.
+            # Chat sessions cannot stream while automatic function calling is enabled, and this
+            # step needs no tools, so call the model directly with function calling turned off.
+            response = self._retry_with_backoff(
+                self.model.generate_content,
+                prompt,
+                stream=True,
+                tool_config={"function_calling_config": {"mode": "NONE"}}
+            )
+            
+            chunks = []
+            for chunk in response:
+                try:
+                    text = chunk.text
+                except ValueError:
+                    continue # Chunk without text parts (e.g. only finish metadata)
+                sys.stdout.write(text)
+                sys.stdout.flush()
+                chunks.append(text)
+            print()
             
             # Extract content from code block if present
-            content = response.text
+            content = "".join(chunks)
             if "```" in content:
-                import re
                 match = re.search(r"```(?:xml|txt|markdown)?\n(.*?)```", content, re.DOTALL)
                 if match:
                     content = match.group(1)
@@ -5,26 +5,218 @@ Tool Manager for Gemini Autonomous Engine
 Defines the tools available to the Gemini agent and handles their execution.
 """
 
+import mmap
 import os
+import re
+import shutil
+import signal
+import stat
 import subprocess
+import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple, Union
 
 from security import validate_command
 
+# Directories never searched by search_codebase
+SEARCH_EXCLUDE_DIRS = (".git", "node_modules", "__pycache__", "venv", "dist", "build", ".mypy_cache", ".pytest_cache")
+# In-process search: O(1) directory rejection, and binary formats skipped without opening them
+_SKIP_DIRS = frozenset(SEARCH_EXCLUDE_DIRS)
+_SKIP_FILE_EXT_RE = re.compile(r"\.(?:pyc|so|o|class|png|jpe?g|gif|zip|tar|gz|pdf|mp4)$", re.IGNORECASE)
+
+# Command output is streamed and only these many lines are ever held in memory.
+# Output longer than BASH_TRUNCATE_LINES is cut to the first BASH_HEAD_LINES and last BASH_TAIL_LINES.
+BASH_TIMEOUT = 120  # seconds
+BASH_TRUNCATE_LINES = 200
+BASH_HEAD_LINES = 10
+BASH_TAIL_LINES = 50
+SEARCH_MAX_MATCHES = 100
+# search_codebase patterns are grep basic regexes (BRE), where ( ) | { } + ? are ordinary
+# characters. Patterns without any of these characters are plain literals, so they can be
+# searched in-process or with `rg --fixed-strings` and still match exactly what grep would.
+_BRE_META_RE = re.compile(r'[.*\[^$\\\n]')
+
+# Number of files whose contents read_file keeps in memory
+READ_CACHE_SIZE = 128
+# Files modified more recently than this are not cached: a same-size rewrite within the
+# filesystem's timestamp granularity would leave (mtime, ctime, inode, size) unchanged
+READ_CACHE_MIN_AGE_NS = 1_000_000_000
+# Worker threads for read_files; reads are I/O bound, so threads overlap the disk waits
+READ_FILES_WORKERS = 8
+
+# Enhanced Tool Feedback: hints for common failures, in priority order (first match wins)
+_ERROR_HINTS = (
+    (("ModuleNotFoundError", "ImportError"), "\n[SYSTEM HINT] Missing dependencies. Check 'requirements.txt' or 'package.json' and install them."),
+    (("SyntaxError",), "\n[SYSTEM HINT] Syntax error detected. Review the code carefully."),
+    (("No such file or directory",), "\n[SYSTEM HINT] File path incorrect. Use 'list_directory' to verify paths."),
+    (("command not found",), "\n[SYSTEM HINT] Command not found. Check if the tool is installed or use a different command."),
+)
+_HINT_PRIORITY = {keyword: i for i, (keywords, _) in enumerate(_ERROR_HINTS) for keyword in keywords}
+# One alternation scans the error output once instead of once per keyword
+_HINT_RE = re.compile("|".join(map(re.escape, _HINT_PRIORITY)))
+
+# Tool declarations for the Gemini API, built once at import time
+_TOOL_DEFINITIONS: List[Dict[str, Any]] = [
+    {
+        "function_declarations": [
+            {
+                "name": "execute_bash",
+                "description": "Execute a bash command. Only safe commands are allowed (ls, cat, grep, git, npm, etc.).",
+                "parameters": {
+                    "type": "OBJECT",
+                    "properties": {
+                        "command": {
+                            "type": "STRING",
+                            "description": "The bash command to execute"
+                        }
+                    },
+                    "required": ["command"]
+                }
+            },
+            {
+                "name": "read_file",
+                "description": "Read the content of a file. Supports line ranges for large files.",
+                "parameters": {
+                    "type": "OBJECT",
+                    "properties": {
+                        "path": {
+                            "type": "STRING",
+                            "description": "Relative path to the file"
+                        },
+                        "start_line": {
+                            "type": "INTEGER",
+                            "description": "Start line number (1-based, optional)"
+                        },
+                        "end_line": {
+                            "type": "INTEGER",
+                            "description": "End line number (1-based, optional, -1 for end)"
+                        }
+                    },
+                    "required": ["path"]
+                }
+            },
+            {
+                "name": "read_files",
+                "description": "Read several whole files in one call. Prefer this over repeated read_file calls.",
+                "parameters": {
+                    "type": "OBJECT",
+                    "properties": {
+                        "paths": {
+                            "type": "ARRAY",
+                            "items": {"type": "STRING"},
+                            "description": "Relative paths to the files"
+                        }
+                    },
+                    "required": ["paths"]
+                }
+            },
+            {
+                "name": "write_file",
+                "description": "Write content to a file. OVERWRITES ENTIRE FILE. Use replace_in_file for small edits.",
+                "parameters": {
+                    "type": "OBJECT",
+                    "properties": {
+                        "path": {
+                            "type": "STRING",
+                            "description": "Relative path to the file"
+                        },
+                        "content": {
+                            "type": "STRING",
+                            "description": "The content to write"
+                        }
+                    },
+                    "required": ["path", "content"]
+                }
+            },
+            {
+                "name": "replace_in_file",
+                "description": "Replace a specific block of text in a file. Safer than write_file for small edits.",
+                "parameters": {
+                    "type": "OBJECT",
+                    "properties": {
+                        "path": {
+                            "type": "STRING",
+                            "description": "Relative path to the file"
+                        },
+                        "old_block": {
+                            "type": "STRING",
+                            "description": "The exact text block to replace (must be unique)"
+                        },
+                        "new_block": {
+                            "type": "STRING",
+                            "description": "The new text block"
+                        }
+                    },
+                    "required": ["path", "old_block", "new_block"]
+                }
+            },
+            {
+                "name": "list_directory",
+                "description": "List contents of a directory.",
+                "parameters": {
+                    "type": "OBJECT",
+                    "properties": {
+                        "path": {
+                            "type": "STRING",
+                            "description": "Relative path to the directory (default: .)"
+                        }
+                    },
+                    "required": ["path"]
+                }
+            }
+        ]
+    }
+]
+
 
 class ToolManager:
     def __init__(self, project_dir: Union[str, Path]):
         self.project_dir = Path(project_dir).resolve()
+        self._project_dir_str = str(self.project_dir)
+        self._project_prefix = self._project_dir_str + os.sep
+        # ripgrep serves literal search_codebase patterns when installed (detected once)
+        self._rg = shutil.which("rg")
+        # read_file LRU: normalized path -> (file version, content, lines or None)
+        self._read_cache: "OrderedDict[str, Tuple[Tuple[int, int, int, int], str, Optional[List[str]]]]" = OrderedDict()
+        self._read_cache_lock = threading.Lock()  # read_files calls read_file from worker threads
         
     def _is_safe_path(self, path: Union[str, Path]) -> bool:
         """Ensure path is within project directory."""
         try:
-            target_path = (self.project_dir / path).resolve()
-            return str(target_path).startswith(str(self.project_dir))
+            # Fast path: a relative path without '..' whose components below the project root
+            # are not symlinks cannot escape, so there is nothing to resolve.
+            # project_dir is already resolved, so only those components need an lstat.
+            if ".." not in Path(path).parts:
+                root = self._project_dir_str
+                candidate = os.path.normpath(os.path.join(root, path))
+                if candidate == root:
+                    return True
+                if candidate.startswith(self._project_prefix):
+                    current = root
+                    for part in candidate[len(root) + 1:].split(os.sep):
+                        current = os.path.join(current, part)
+                        if os.path.islink(current):
+                            break
+                    else:
+                        return True
+            
+            # Ambiguous ('..', absolute paths or symlinks): resolve for real.
+            # realpath + commonpath work on plain strings, with no Path objects built per step.
+            target = os.path.realpath(os.path.join(self._project_dir_str, path))
+            return os.path.commonpath([self._project_dir_str, target]) == self._project_dir_str
         except Exception:
             return False
 
+    def _validate_path(self, path: Union[str, Path]) -> Path:
+        """Return the absolute path inside the project directory, or raise ValueError."""
+        if not self._is_safe_path(path):
+            raise ValueError("Access denied (path outside project directory)")
+        return self.project_dir / path
+
     def execute_bash(self, command: str) -> str:
         """
         Execute a bash command if it passes security validation.
@@ -35,61 +227,103 @@ class ToolManager:
         Returns:
             Command output (stdout + stderr) or error message
         """
-        # Security check
+        # Security check (memoized per command string inside validate_command)
         is_allowed, reason = validate_command(command)
         if not is_allowed:
             return f"[SECURITY BLOCK] Command blocked: {reason}"
             
         try:
-            # Run command in project directory
-            result = subprocess.run(
+            # Run command in project directory.
+            # Output is read line by line as it is produced: stderr is merged into stdout so a
+            # single pipe can be drained without deadlocking, and at most head + tail lines are kept.
+            # The command gets its own process group so a timeout kills its children too.
+            proc = subprocess.Popen(
                 command,
                 shell=True,
                 cwd=self.project_dir,
-                capture_output=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
                 text=True,
-                timeout=120  # 2 minute timeout
+                errors='replace',
+                bufsize=1,
+                start_new_session=True
             )
+            timed_out = threading.Event()
+            
+            def kill():
+                timed_out.set()
+                try:
+                    os.killpg(proc.pid, signal.SIGKILL)
+                except OSError:
+                    pass
+            
+            timer = threading.Timer(BASH_TIMEOUT, kill)
+            timer.start()
+            try:
+                # Keep enough tail lines to reproduce short outputs exactly
+                head, tail, total = self._stream_lines(
+                    proc.stdout, BASH_HEAD_LINES, BASH_TRUNCATE_LINES - BASH_HEAD_LINES
+                )
+                returncode = proc.wait()
+            finally:
+                timer.cancel()
+                # The own session means Ctrl-C never reaches the command, so an exception or
+                # KeyboardInterrupt while reading must kill it here or it is orphaned
+                if proc.poll() is None:
+                    try:
+                        os.killpg(proc.pid, signal.SIGKILL)
+                    except OSError:
+                        pass
+                    proc.wait()
+                proc.stdout.close()
+            
+            if timed_out.is_set():
+                return f"Error: Command timed out after {BASH_TIMEOUT} seconds"
+            
+            # Smart Truncation
+            if total > BASH_TRUNCATE_LINES:
+                tail = list(tail)[-BASH_TAIL_LINES:]
+                truncated_count = total - BASH_HEAD_LINES - BASH_TAIL_LINES
+                output = "".join(head).rstrip("\n") + \
+                         f"\n\n... [TRUNCATED {truncated_count} LINES OF OUTPUT] ...\n\n" + \
+                         "".join(tail).rstrip("\n")
+            else:
+                output = "".join(head) + "".join(tail)
             
             # Enhanced Tool Feedback (Round 5 Optimization)
-            if result.returncode != 0:
-                error_msg = result.stderr.strip()
+            if returncode != 0:
+                error_msg = output.strip()
                 hint = ""
                 
                 # Common Error Heuristics
-                if "ModuleNotFoundError" in error_msg or "ImportError" in error_msg:
-                    hint = "\n[SYSTEM HINT] Missing dependencies. Check 'requirements.txt' or 'package.json' and install them."
-                elif "SyntaxError" in error_msg:
-                    hint = "\n[SYSTEM HINT] Syntax error detected. Review the code carefully."
-                elif "No such file or directory" in error_msg:
-                    hint = "\n[SYSTEM HINT] File path incorrect. Use 'list_directory' to verify paths."
-                elif "command not found" in error_msg:
-                    hint = "\n[SYSTEM HINT] Command not found. Check if the tool is installed or use a different command."
+                matched = set(_HINT_RE.findall(error_msg))
+                if matched:
+                    hint = _ERROR_HINTS[min(_HINT_PRIORITY[keyword] for keyword in matched)][1]
                 
-                return f"Error (Exit Code {result.returncode}):\n{error_msg}{hint}"
-            
-            # Combine stdout and stderr
-            output = result.stdout
-            if result.stderr:
-                output += f"\nSTDERR:\n{result.stderr}"
-            
-            # Smart Truncation
-            lines = output.splitlines()
-            if len(lines) > 200:
-                head = lines[:10]
-                tail = lines[-50:]
-                truncated_count = len(lines) - 60
-                output = "\n".join(head) + \
-                         f"\n\n... [TRUNCATED {truncated_count} LINES OF OUTPUT] ...\n\n" + \
-                         "\n".join(tail)
+                return f"Error (Exit Code {returncode}):\n{error_msg}{hint}"
             
             return output
             
-        except subprocess.TimeoutExpired:
-            return "Error: Command timed out after 120 seconds"
         except Exception as e:
             return f"Error executing command: {str(e)}"
 
+    @staticmethod
+    def _stream_lines(stream, head_size: int, tail_size: int) -> Tuple[List[str], Deque[str], int]:
+        """
+        Consume a line stream keeping only the first head_size and last tail_size lines.
+        Returns (head, tail, total line count); lines keep their trailing newline.
+        """
+        head: List[str] = []
+        tail: Deque[str] = deque(maxlen=tail_size)
+        total = 0
+        for line in stream:
+            total += 1
+            if total <= head_size:
+                head.append(line)
+            else:
+                tail.append(line)
+        return head, tail, total
+
     def read_file(self, path: str, start_line: int = 1, end_line: int = -1) -> str:
         """
         Read the content of a file. 
@@ -97,16 +331,31 @@ class ToolManager:
         """
         try:
             file_path = self._validate_path(path)
-            if not file_path.exists():
+            try:
+                st = os.stat(file_path)
+            except FileNotFoundError:
                 return f"Error: File {path} does not exist."
-            if not file_path.is_file():
+            if not stat.S_ISREG(st.st_mode):
                 return f"Error: Not a file: {path}"
             
-            content = file_path.read_text(encoding='utf-8')
-            lines = content.splitlines()
+            # Serve unchanged files from the LRU; the single stat above is the only syscall on a hit
+            key = os.path.normpath(file_path)
+            with self._read_cache_lock:
+                cached = self._read_cache.get(key)
+                hit = cached is not None and cached[0] == self._file_version(st)
+                if hit:
+                    self._read_cache.move_to_end(key)
+            if hit:
+                content, lines = cached[1], cached[2]
+            else:
+                content, lines = self._read_utf8(file_path), None
             
             # Handle line ranges
             if start_line > 1 or end_line != -1:
+                # Split once per file version; later ranges just slice the cached list
+                if lines is None:
+                    lines = content.splitlines()
+                self._cache_read(key, st, content, lines)
                 total_lines = len(lines)
                 start_idx = max(0, start_line - 1)
                 end_idx = total_lines if end_line == -1 else min(total_lines, end_line)
@@ -122,12 +371,65 @@ class ToolManager:
                 
                 return "\n".join(numbered_lines)
             
+            self._cache_read(key, st, content, lines)
             return content
         except ValueError as e:
             return f"Error: {str(e)}"
         except Exception as e:
             return f"Error reading file: {str(e)}"
 
+    def read_files(self, paths: List[str]) -> str:
+        """
+        Read several whole files in one tool call.
+        The reads run concurrently; each file is returned under its own header, in request order.
+        """
+        if not paths:
+            return "Error: No paths given."
+        if len(paths) == 1:
+            results = [self.read_file(paths[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=min(READ_FILES_WORKERS, len(paths))) as executor:
+                results = list(executor.map(self.read_file, paths))
+        
+        return "\n\n".join(f"=== {path} ===\n{result}" for path, result in zip(paths, results))
+
+    @staticmethod
+    def _read_bytes(file_path: Path) -> bytes:
+        with open(file_path, 'rb') as f:
+            return f.read()
+
+    @classmethod
+    def _read_utf8(cls, file_path: Path) -> str:
+        """
+        Read a file as UTF-8 text: one raw read and a single decode at the end, instead of the
+        text I/O layer's incremental decoding. Newlines are normalized like text mode does.
+        """
+        content = cls._read_bytes(file_path).decode('utf-8')
+        if '\r' in content:
+            content = content.replace('\r\n', '\n').replace('\r', '\n')
+        return content
+
+    @staticmethod
+    def _file_version(st: os.stat_result) -> Tuple[int, int, int, int]:
+        """What must match for a cached read to still be current: a replaced file gets a new inode."""
+        return (st.st_mtime_ns, st.st_ctime_ns, st.st_ino, st.st_size)
+
+    def _cache_read(self, key: str, st: os.stat_result, content: str, lines: Optional[List[str]]):
+        with self._read_cache_lock:
+            # A file still inside the timestamp granularity window could change without its
+            # version changing, so it is not cached until it has settled
+            if time.time_ns() - st.st_mtime_ns < READ_CACHE_MIN_AGE_NS:
+                self._read_cache.pop(key, None)
+                return
+            self._read_cache[key] = (self._file_version(st), content, lines)
+            self._read_cache.move_to_end(key)
+            if len(self._read_cache) > READ_CACHE_SIZE:
+                self._read_cache.popitem(last=False)
+
+    def _invalidate_read(self, file_path: Path):
+        with self._read_cache_lock:
+            self._read_cache.pop(os.path.normpath(file_path), None)
+
     def write_file(self, path: str, content: str) -> str:
         """
         Write content to a file.
@@ -147,6 +449,7 @@ class ToolManager:
         try:
             target_path.parent.mkdir(parents=True, exist_ok=True)
             target_path.write_text(content, encoding='utf-8')
+            self._invalidate_read(target_path)
             return f"Successfully wrote to {path}"
         except Exception as e:
             return f"Error writing file: {str(e)}"
@@ -161,18 +464,22 @@ class ToolManager:
             if not file_path.exists():
                 return f"Error: File {path} does not exist."
             
-            content = file_path.read_text(encoding='utf-8')
+            content = self._read_utf8(file_path)
             
-            # Check for uniqueness
-            count = content.count(old_block)
-            if count == 0:
+            # Check for uniqueness: find the first occurrence, then look for a second one after it.
+            # The full count is only needed for the error message.
+            first = content.find(old_block)
+            if first == -1:
                 return "Error: 'old_block' not found in file. Please verify the exact content."
-            if count > 1:
+            end = first + len(old_block)
+            if content.find(old_block, end) != -1:
+                count = content.count(old_block)
                 return f"Error: 'old_block' found {count} times. Replacement must be unique. Provide more context."
             
             # Perform replacement
-            new_content = content.replace(old_block, new_block)
+            new_content = content[:first] + new_block + content[end:]
             file_path.write_text(new_content, encoding='utf-8')
+            self._invalidate_read(file_path)
             
             return f"Successfully replaced content in {path}"
             
@@ -203,149 +510,137 @@ class ToolManager:
             return f"Error: Not a directory: {path}"
             
         try:
-            items = []
-            for item in target_path.iterdir():
-                type_str = "DIR " if item.is_dir() else "FILE"
-                items.append(f"{type_str:4} {item.name}")
+            # scandir gets the entry type from readdir, so only symlinks cost a stat.
+            # Directories first, then by name (DirEntry caches is_dir, so the key is free).
+            with os.scandir(target_path) as it:
+                entries = sorted(it, key=lambda entry: (not entry.is_dir(), entry.name))
             
-            return "\n".join(sorted(items))
+            return "\n".join(("DIR  " if entry.is_dir() else "FILE ") + entry.name for entry in entries)
         except Exception as e:
             return f"Error listing directory: {str(e)}"
 
     def search_codebase(self, pattern: str) -> str:
         """
-        Search for a string pattern in the codebase using grep.
+        Search for a grep basic regex (BRE) in the codebase.
+        Literal patterns use ripgrep when it is installed (or an in-process search when not);
+        anything else runs grep, so every pattern means the same whichever tool is present.
         """
         try:
-            # Use grep -r to search recursively
-            # -n: line numbers
-            # -I: ignore binary files
-            # --exclude-dir: ignore common junk directories
-            cmd = [
-                "grep", "-rnI",
-                "--exclude-dir=.git", "--exclude-dir=node_modules", "--exclude-dir=__pycache__", 
-                "--exclude-dir=venv", "--exclude-dir=dist", "--exclude-dir=build",
-                pattern, "."
-            ]
-            
-            result = subprocess.run(
-                cmd, 
-                cwd=self.project_dir, 
-                capture_output=True, 
-                text=True
-            )
+            literal = bool(pattern) and not _BRE_META_RE.search(pattern)
+            if literal and not self._rg:
+                # Literal pattern and no ripgrep: search in-process instead of forking grep
+                lines, _, total = self._stream_lines(
+                    self._literal_search(pattern.encode('utf-8')), SEARCH_MAX_MATCHES, 0
+                )
+            else:
+                if literal:
+                    # ripgrep reads patterns as Rust regexes, so it only ever gets literals.
+                    # It walks in parallel and prunes excluded/.gitignore'd trees at walk time.
+                    # Binary files are skipped by default; --hidden keeps grep's dotfile coverage.
+                    # --max-columns: replace pathological (e.g. minified) lines with a short notice
+                    cmd = [
+                        self._rg, "--line-number", "--no-heading", "--hidden",
+                        "--max-columns=150", "--threads=0",
+                        *(f"--glob=!{d}" for d in SEARCH_EXCLUDE_DIRS),
+                        "--fixed-strings", "-e", pattern, "."
+                    ]
+                else:
+                    # Use grep -r to search recursively
+                    # -n: line numbers
+                    # -I: ignore binary files
+                    # --exclude-dir: ignore common junk directories
+                    cmd = [
+                        "grep", "-rnI",
+                        *(f"--exclude-dir={d}" for d in SEARCH_EXCLUDE_DIRS),
+                        pattern, "."
+                    ]
+                
+                # Stream matches so a huge result set never sits in memory: keep the first
+                # SEARCH_MAX_MATCHES lines and only count the rest.
+                # stderr goes to a temp file so it can never fill a pipe and stall the search.
+                with tempfile.TemporaryFile() as stderr_file:
+                    with subprocess.Popen(
+                        cmd,
+                        cwd=self.project_dir,
+                        stdout=subprocess.PIPE,
+                        stderr=stderr_file,
+                        text=True,
+                        errors='replace',
+                        bufsize=1
+                    ) as proc:
+                        lines, _, total = self._stream_lines(proc.stdout, SEARCH_MAX_MATCHES, 0)
+                    
+                    # grep and rg exit with 2 on errors (e.g. an invalid pattern); 1 means no matches
+                    if proc.returncode > 1 and not total:
+                        stderr_file.seek(0)
+                        message = stderr_file.read().decode('utf-8', 'replace').strip()
+                        return f"Error searching codebase: {message or f'exit status {proc.returncode}'}"
             
-            output = result.stdout
-            if not output:
+            if not total:
                 return "No matches found."
                 
             # Truncate if too long
-            lines = output.splitlines()
-            if len(lines) > 100:
-                return "\n".join(lines[:100]) + f"\n... ({len(lines)-100} more matches truncated)"
+            if total > SEARCH_MAX_MATCHES:
+                return "".join(lines).rstrip("\n") + f"\n... ({total - SEARCH_MAX_MATCHES} more matches truncated)"
             
-            return output
+            return "".join(lines)
             
         except Exception as e:
             return f"Error searching codebase: {str(e)}"
 
+    def _literal_search(self, needle: bytes) -> Iterator[str]:
+        """
+        Yield grep -rnI style "./path:line:text" matches for a literal byte string.
+        Each file is mmap'ed and searched with mmap.find (memchr/memmem), so files without a
+        match are rejected without copying them into Python. Like grep -r, symlinks are not
+        followed, excluded directories are pruned and files containing NUL bytes are skipped.
+        """
+        return self._literal_search_dir(needle, self._project_dir_str, ".")
+
+    def _literal_search_dir(self, needle: bytes, dir_path: str, display_dir: str) -> Iterator[str]:
+        try:
+            with os.scandir(dir_path) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError:
+            return
+        
+        for entry in entries:
+            display_path = f"{display_dir}/{entry.name}"
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in _SKIP_DIRS:
+                    yield from self._literal_search_dir(needle, entry.path, display_path)
+                continue
+            if _SKIP_FILE_EXT_RE.search(entry.name) or not entry.is_file(follow_symlinks=False):
+                continue
+            try:
+                with open(entry.path, 'rb', buffering=0) as f:
+                    if os.fstat(f.fileno()).st_size == 0:
+                        continue
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        if mm.find(needle) == -1 or mm.find(b"\0") != -1:
+                            continue
+                        data = mm[:]
+            except (OSError, ValueError):
+                continue
+            
+            # Walk the hits, counting newlines between them for line numbers
+            lineno, counted_to = 1, 0
+            hit = data.find(needle)
+            while hit != -1:
+                line_start = data.rfind(b"\n", 0, hit) + 1
+                line_end = data.find(b"\n", hit)
+                if line_end == -1:
+                    line_end = len(data)
+                lineno += data.count(b"\n", counted_to, line_start)
+                counted_to = line_start
+                text = data[line_start:line_end].decode('utf-8', 'replace')
+                yield f"{display_path}:{lineno}:{text}\n"
+                # Every line is reported once, however many hits it has
+                hit = data.find(needle, line_end + 1)
+
     def get_tool_definitions(self) -> List[Dict[str, Any]]:
         """
         Return the tool definitions for Gemini API.
+        The definitions are constant, so one shared instance is returned: do not mutate it.
         """
-        return [
-            {
-                "function_declarations": [
-                    {
-                        "name": "execute_bash",
-                        "description": "Execute a bash command. Only safe commands are allowed (ls, cat, grep, git, npm, etc.).",
-                        "parameters": {
-                            "type": "OBJECT",
-                            "properties": {
-                                "command": {
-                                    "type": "STRING",
-                                    "description": "The bash command to execute"
-                                }
-                            },
-                            "required": ["command"]
-                        }
-                    },
-                    {
-                        "name": "read_file",
-                        "description": "Read the content of a file. Supports line ranges for large files.",
-                        "parameters": {
-                            "type": "OBJECT",
-                            "properties": {
-                                "path": {
-                                    "type": "STRING",
-                                    "description": "Relative path to the file"
-                                },
-                                "start_line": {
-                                    "type": "INTEGER",
-                                    "description": "Start line number (1-based, optional)"
-                                },
-                                "end_line": {
-                                    "type": "INTEGER",
-                                    "description": "End line number (1-based, optional, -1 for end)"
-                                }
-                            },
-                            "required": ["path"]
-                        }
-                    },
-                    {
-                        "name": "write_file",
-                        "description": "Write content to a file. OVERWRITES ENTIRE FILE. Use replace_in_file for small edits.",
-                        "parameters": {
-                            "type": "OBJECT",
-                            "properties": {
-                                "path": {
-                                    "type": "STRING",
-                                    "description": "Relative path to the file"
-                                },
-                                "content": {
-                                    "type": "STRING",
-                                    "description": "The content to write"
-                                }
-                            },
-                            "required": ["path", "content"]
-                        }
-                    },
-                    {
-                        "name": "replace_in_file",
-                        "description": "Replace a specific block of text in a file. Safer than write_file for small edits.",
-                        "parameters": {
-                            "type": "OBJECT",
-                            "properties": {
-                                "path": {
-                                    "type": "STRING",
-                                    "description": "Relative path to the file"
-                                },
-                                "old_block": {
-                                    "type": "STRING",
-                                    "description": "The exact text block to replace (must be unique)"
-                                },
-                                "new_block": {
-                                    "type": "STRING",
-                                    "description": "The new text block"
-                                }
-                            },
-                            "required": ["path", "old_block", "new_block"]
-                        }
-                    },
-                    {
-                        "name": "list_directory",
-                        "description": "List contents of a directory.",
-                        "parameters": {
-                            "type": "OBJECT",
-                            "properties": {
-                                "path": {
-                                    "type": "STRING",
-                                    "description": "Relative path to the directory (default: .)"
-                                }
-                            },
-                            "required": ["path"]
-                        }
-                    }
-                ]
-            }
-        ]
+        return _TOOL_DEFINITIONS
@@ -1,3 +1,4 @@
+import atexit
 import json
 import time
 import os
@@ -11,14 +12,29 @@ class RateLimiter:
         self.max_tpm = max_tpm
         self.usage_file = project_dir / "usage_stats.json"
         
-        # TPM Tracking (Rolling Window)
-        self.token_window = [] # List of (timestamp, token_count)
+        # TPM Tracking (Token Bucket)
+        # The bucket holds up to max_tpm tokens and refills continuously at max_tpm per minute,
+        # so each check is O(1) regardless of how many requests were made.
+        # time.monotonic() keeps refills immune to wall-clock jumps.
+        self._tpm_rate = max_tpm / 60.0
+        self._tpm_tokens = float(max_tpm)
+        self._last_refill = time.monotonic()
+        
+        # The request counter lives in memory and is flushed every _flush_every requests
+        # and once more at exit, instead of rewriting the file on every request.
+        self._dirty_count = 0
+        self._flush_every = 10
         
         self._load_usage()
+        atexit.register(self._flush_usage)
+
+    @staticmethod
+    def _today() -> str:
+        return datetime.now(timezone.utc).strftime("%Y-%m-%d")
 
     def _load_usage(self):
         """Load daily usage stats, resetting if it's a new day (UTC)."""
-        today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        today = self._today()
         
         if self.usage_file.exists():
             try:
@@ -41,7 +57,23 @@ class RateLimiter:
             "requests": self.current_rpd,
             "last_updated": datetime.now(timezone.utc).isoformat()
         }
-        self.usage_file.write_text(json.dumps(data, indent=2))
+        # Write a temp file and swap it in, so a crash mid-write never leaves a truncated file
+        tmp_file = self.usage_file.with_name(self.usage_file.name + ".tmp")
+        # Compact separators: the file is only ever read back by _load_usage
+        tmp_file.write_text(json.dumps(data, separators=(",", ":")))
+        os.replace(tmp_file, self.usage_file)
+        self._dirty_count = 0
+
+    def _flush_usage(self):
+        """Save usage stats if there are unsaved requests."""
+        if self._dirty_count:
+            self._save_usage()
+
+    def _refill(self):
+        """Add the tokens earned since the last refill, capped at the bucket size."""
+        now = time.monotonic()
+        self._tpm_tokens = min(self.max_tpm, self._tpm_tokens + (now - self._last_refill) * self._tpm_rate)
+        self._last_refill = now
 
     def check_and_wait(self, estimated_tokens: int):
         """
@@ -50,6 +82,12 @@ class RateLimiter:
         - Sleeps if TPM limit approaching.
         """
         # 1. Check RPD (Requests Per Day)
+        # Fixed daily window: reset at UTC midnight even if the process keeps running
+        today = self._today()
+        if today != self.current_date:
+            self.current_date = today
+            self.current_rpd = 0
+        
         if self.current_rpd >= self.max_rpd:
             raise Exception(f"Daily Request Limit Reached ({self.current_rpd}/{self.max_rpd}). Please wait until tomorrow (UTC).")
         
@@ -57,25 +95,23 @@ class RateLimiter:
             print(f"\n[WARNING] Approaching Daily Request Limit: {self.current_rpd}/{self.max_rpd}")
 
         # 2. Check TPM (Tokens Per Minute)
-        now = time.time()
-        # Clean up old window entries (> 60s ago)
-        self.token_window = [(t, c) for t, c in self.token_window if now - t < 60]
+        self._refill()
+        # A request larger than the whole bucket can only wait for a full bucket
+        needed = min(estimated_tokens, self.max_tpm)
         
-        current_tpm = sum(c for t, c in self.token_window)
-        
-        if current_tpm + estimated_tokens > self.max_tpm:
-            wait_time = 60 - (now - self.token_window[0][0]) + 1
+        if self._tpm_tokens < needed:
+            current_tpm = int(self.max_tpm - self._tpm_tokens)
+            wait_time = (needed - self._tpm_tokens) / self._tpm_rate
             print(f"\n[Rate Limit] TPM Limit approaching ({current_tpm + estimated_tokens} > {self.max_tpm}). Sleeping for {wait_time:.1f}s...")
             time.sleep(wait_time)
-            
-            # Re-clean after sleep
-            now = time.time()
-            self.token_window = [(t, c) for t, c in self.token_window if now - t < 60]
+            self._refill()
 
     def record_request(self, token_count: int):
         """Record a successful request."""
         self.current_rpd += 1
-        self._save_usage()
+        self._dirty_count += 1
+        if self._dirty_count >= self._flush_every:
+            self._save_usage()
         
-        now = time.time()
-        self.token_window.append((now, token_count))
+        self._refill()
+        self._tpm_tokens -= token_count
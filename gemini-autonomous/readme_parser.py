@@ -1,38 +1,79 @@
+import mmap
+import os
 import re
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple, Union
+
+# Regex to find unchecked tasks: - [ ] Task Name
+# We capture the task description. The markers are ASCII, so the scan runs on the raw bytes
+# and only the captures are decoded.
+# Captures of fewer than 4 bytes can never give a task of 4+ characters, so the regex drops
+# them up front; bytes \s is ASCII-only, so the decoded text is still strip()ed and its
+# character length is what decides.
+_TASK_RE = re.compile(rb'^\s*-\s*\[ \]\s*(\S.{2,}\S)\s*$', re.MULTILINE)
+
+# READMEs larger than this are scanned through a read-only mmap instead of being read into memory
+_MMAP_THRESHOLD = 64 * 1024
+
+
+@lru_cache(maxsize=256)
+def _compile_mark_pattern(task_name: str) -> "re.Pattern":
+    """
+    Pattern: - [ ] Task Name (ignoring case and whitespace), built once per task name.
+    ASCII names get a bytes pattern that runs on the raw file; others need str matching
+    for Unicode case folding.
+    """
+    # Escape special regex characters in task_name just in case
+    if task_name.isascii():
+        escaped_name = re.escape(task_name.encode('ascii'))
+        return re.compile(rb'(-\s*\[) \](\s*' + escaped_name + rb')', re.IGNORECASE)
+    escaped_name = re.escape(task_name)
+    return re.compile(r'(-\s*\[) \](\s*' + escaped_name + r')', re.IGNORECASE)
+
 
 class ReadmeParser:
     def __init__(self, project_dir: Path):
         self.project_dir = project_dir
         self.readme_path = project_dir / "README.md"
+        # extract_tasks() result for the README version it was parsed from: (mtime_ns, size, tasks)
+        self._task_cache: Optional[Tuple[int, int, List[Dict[str, str]]]] = None
 
     def extract_tasks(self) -> List[Dict[str, str]]:
         """
         Extract incomplete tasks from README.md.
         Looks for lines starting with '- [ ]'.
         """
-        if not self.readme_path.exists():
+        try:
+            stat = self.readme_path.stat()
+        except OSError:
             return []
-
-        content = self.readme_path.read_text(encoding='utf-8')
-        tasks = []
         
-        # Regex to find unchecked tasks: - [ ] Task Name
-        # We capture the task description
-        matches = re.findall(r'^\s*-\s*\[ \]\s*(.+)$', content, re.MULTILINE)
+        # Unchanged README: one stat, no read or regex pass
+        if self._task_cache and self._task_cache[:2] == (stat.st_mtime_ns, stat.st_size):
+            return list(self._task_cache[2])
+
+        if stat.st_size > _MMAP_THRESHOLD:
+            with open(self.readme_path, 'rb') as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                # findall copies out only the captured groups
+                matches = _TASK_RE.findall(mm)
+        else:
+            matches = _TASK_RE.findall(self.readme_path.read_bytes())
         
+        tasks = []
         for match in matches:
-            task_desc = match.strip()
+            task_desc = match.decode('utf-8', 'replace').strip()
             # Filter out empty or trivial tasks
-            if task_desc and len(task_desc) > 3:
+            if len(task_desc) > 3:
                 tasks.append({
                     "name": task_desc,
                     "description": f"Imported from README: {task_desc}",
                     "passes": False
                 })
         
-        return tasks
+        self._task_cache = (stat.st_mtime_ns, stat.st_size, tasks)
+        return list(tasks)
 
     def mark_task_complete(self, task_name: str) -> bool:
         """
@@ -42,17 +83,21 @@ class ReadmeParser:
         if not self.readme_path.exists():
             return False
 
-        content = self.readme_path.read_text(encoding='utf-8')
-        
-        # Escape special regex characters in task_name just in case
-        escaped_name = re.escape(task_name)
+        pattern = _compile_mark_pattern(task_name)
+        content: Union[bytes, str] = self.readme_path.read_bytes()
+        if isinstance(pattern.pattern, str):
+            content = content.decode('utf-8')
         
-        # Pattern: - [ ] Task Name (ignoring case and whitespace)
-        pattern = re.compile(r'(-\s*\[) \](\s*' + escaped_name + r')', re.IGNORECASE)
+        # One pass finds and substitutes; nothing is written when the task is absent
+        new_content, count = pattern.subn(r'\1x]\2' if isinstance(content, str) else rb'\1x]\2', content)
+        if not count:
+            return False
         
-        if pattern.search(content):
-            new_content = pattern.sub(r'\1x]\2', content)
-            self.readme_path.write_text(new_content, encoding='utf-8')
-            return True
-            
-        return False
+        if isinstance(new_content, str):
+            new_content = new_content.encode('utf-8')
+        # Write a temp file and swap it in, so the README is never left half-written
+        tmp_path = self.readme_path.with_name(self.readme_path.name + ".tmp")
+        tmp_path.write_bytes(new_content)
+        os.replace(tmp_path, self.readme_path)
+        self._task_cache = None
+        return True
@@ -6,12 +6,12 @@ Validates bash commands for security.
 Uses an allowlist approach - only explicitly permitted commands can run.
 """
 
-import os
+import functools
 import shlex
-import re
+from typing import Optional
 
 # Allowed commands for development tasks
-ALLOWED_COMMANDS = {
+ALLOWED_COMMANDS = frozenset({
     # File inspection
     "ls",
     "cat",
@@ -40,81 +40,210 @@ ALLOWED_COMMANDS = {
     "pkill",
     # Script execution
     "init.sh",
-}
+})
 
 # Commands that need additional validation even when in the allowlist
-COMMANDS_NEEDING_EXTRA_VALIDATION = {"pkill", "chmod", "init.sh"}
+COMMANDS_NEEDING_EXTRA_VALIDATION = frozenset({"pkill", "chmod", "init.sh"})
 
 
-def split_command_segments(command_string: str) -> list[str]:
-    """Split a compound command into individual command segments."""
-    # Split on && and || while preserving the ability to handle each segment
-    segments = re.split(r"\s*(?:&&|\|\|)\s*", command_string)
+# Characters that can start a quote, escape, separator or unsupported construct; without
+# any of them a command string is a single segment
+_SEGMENT_SPECIAL_CHARS = frozenset(";\n&|'\"\\$`#(<")
+# A '#' after one of these (or at the start) begins a comment
+_COMMENT_PRECEDERS = frozenset(" \t\r\n;&|()<>")
 
-    # Further split on semicolons
-    result = []
-    for segment in segments:
-        sub_segments = re.split(r'(?<!["\'])\s*;\s*(?!["\'])', segment)
-        for sub in sub_segments:
-            sub = sub.strip()
-            if sub:
-                result.append(sub)
 
-    return result
+def _split_segments(command_string: str) -> Optional[list[str]]:
+    """
+    Split a command list into simple commands on the ;, newline, &, &&, |, || and |& that are
+    outside quotes, in one pass. The & in the redirections >&, <& and &> and the | in >| are
+    not separators.
+    Follows shell quoting: nothing is special inside '...', and a backslash escapes the next
+    character outside quotes and inside "...".
+    Returns None (fail closed) for syntax whose quoting or nesting this scanner does not model,
+    because a separator hidden in it would run unchecked: $'...', $(...), ${...}, $[...],
+    backticks, <(...)/>(...), here-documents and comments.
+    """
+    # Fast exit: the membership scan runs in C, so typical simple commands skip the loop
+    if _SEGMENT_SPECIAL_CHARS.isdisjoint(command_string):
+        command_string = command_string.strip()
+        return [command_string] if command_string else []
+
+    segments = []
+    start = 0
+    quote = None
+    redirect_end = -1  # index just past the last unquoted < or >
+    i = 0
+    n = len(command_string)
+
+    while i < n:
+        c = command_string[i]
+        if quote == "'":
+            if c == "'":
+                quote = None
+        elif quote:
+            if c == '"':
+                quote = None
+            elif c == "\\":
+                i += 1
+            # Command substitution still runs inside "..."
+            elif c == "`" or (c == "$" and command_string[i + 1:i + 2] == "("):
+                return None
+        elif c == "'" or c == '"':
+            quote = c
+        elif c == "\\":
+            i += 1
+        elif c == "`":
+            return None
+        elif c == "$":
+            if command_string[i + 1:i + 2] in ("'", "(", "{", "["):
+                return None
+        elif c == "#":
+            if i == 0 or command_string[i - 1] in _COMMENT_PRECEDERS:
+                return None
+        elif c == "<" and command_string[i + 1:i + 2] == "<":
+            return None
+        elif c == "(" and redirect_end == i:
+            return None
+        elif c == "<" or c == ">":
+            redirect_end = i + 1
+        elif c == ";" or c == "\n":
+            segments.append(command_string[start:i])
+            start = i + 1
+        elif c == "&":
+            if redirect_end != i and command_string[i + 1:i + 2] != ">":
+                segments.append(command_string[start:i])
+                if command_string[i + 1:i + 2] == "&":
+                    i += 1
+                start = i + 1
+        elif c == "|":
+            if redirect_end != i or command_string[i - 1] != ">":
+                segments.append(command_string[start:i])
+                if command_string[i + 1:i + 2] in ("|", "&"):
+                    i += 1
+                start = i + 1
+        i += 1
+
+    segments.append(command_string[start:])
+    return [segment.strip() for segment in segments if segment.strip()]
+
+
+_LEX_WHITESPACE = frozenset(" \t\r\n")
+
+
+def _lex(s: str) -> Optional[list[str]]:
+    """
+    Split a command into words like shlex.split (POSIX mode, no comments), for the subset the
+    validators need: whitespace separation, '...' and "..." quoting and backslash escapes.
+    Returns None where shlex.split would raise ValueError (unclosed quote, trailing backslash),
+    and for bash ANSI-C quoting ($'...'), whose backslash escapes shlex does not know.
+    """
+    tokens = []
+    chunks = []
+    in_token = False  # True once the current word has started, so '' yields an empty word
+    i = 0
+    n = len(s)
+
+    while i < n:
+        c = s[i]
+        if c in _LEX_WHITESPACE:
+            if in_token:
+                tokens.append("".join(chunks))
+                chunks.clear()
+                in_token = False
+            i += 1
+            continue
 
+        in_token = True
+        if c == "'":
+            end = s.find("'", i + 1)
+            if end < 0:
+                return None
+            chunks.append(s[i + 1:end])
+            i = end + 1
+        elif c == '"':
+            i += 1
+            while True:
+                if i >= n:
+                    return None
+                c = s[i]
+                if c == '"':
+                    break
+                # Inside "...", a backslash only escapes " and \
+                if c == "\\" and i + 1 < n and s[i + 1] in '"\\':
+                    i += 1
+                    c = s[i]
+                chunks.append(c)
+                i += 1
+            i += 1
+        elif c == "\\":
+            if i + 1 >= n:
+                return None
+            chunks.append(s[i + 1])
+            i += 2
+        elif c == "$" and s[i + 1:i + 2] == "'":
+            return None
+        else:
+            chunks.append(c)
+            i += 1
 
-def extract_commands(command_string: str) -> list[str]:
-    """Extract command names from a shell command string."""
-    commands = []
-    
-    # Split on semicolons that aren't inside quotes
-    segments = re.split(r'(?<!["\'])\s*;\s*(?!["\'])', command_string)
+    if in_token:
+        tokens.append("".join(chunks))
+    return tokens
 
-    for segment in segments:
-        segment = segment.strip()
-        if not segment:
-            continue
 
-        try:
-            tokens = shlex.split(segment)
-        except ValueError:
-            return []
+# Shell keywords that never name a command
+_KEYWORDS = frozenset({"if", "then", "else", "elif", "fi", "for", "while",
+                       "until", "do", "done", "case", "esac", "in", "!", "{", "}"})
 
-        if not tokens:
-            continue
 
-        expect_command = True
+def _is_assignment(token: str) -> bool:
+    """True for a NAME=value shell variable assignment (NAME is [A-Za-z_][A-Za-z0-9_]*)."""
+    name, eq, _ = token.partition("=")
+    return bool(eq) and name.isidentifier() and name.isascii()
 
-        for token in tokens:
-            if token in ("|", "||", "&&", "&"):
-                expect_command = True
-                continue
 
-            if token in ("if", "then", "else", "elif", "fi", "for", "while", 
-                        "until", "do", "done", "case", "esac", "in", "!", "{", "}"):
-                continue
+# The rule sets are bound as default arguments so the hot loops read them as fast locals
+def _parse_command(command_string: str, _keywords=_KEYWORDS) -> list[tuple[str, str]]:
+    """
+    Parse a shell command string in a single pass.
+    Returns one (segment, command name) pair per simple command, where segment is that
+    command's tokens from its name onwards, re-quoted with shlex.join.
+    Returns [] if any part cannot be tokenized.
+    """
+    segments = _split_segments(command_string)
+    if segments is None:
+        return []
 
-            if token.startswith("-"):
-                continue
+    pairs = []
+    for segment in segments:
+        tokens = _lex(segment)
+        if tokens is None:
+            return []
 
-            if "=" in token and not token.startswith("="):
+        # Each segment is one simple command: its name is the first token that is not a
+        # keyword, flag or assignment (NAME=value)
+        for i, token in enumerate(tokens):
+            if token in _keywords or token[:1] == "-" or _is_assignment(token):
                 continue
+            # Same as os.path.basename on POSIX, without the posixpath call
+            pairs.append((shlex.join(tokens[i:]), token.rpartition("/")[2]))
+            break
+
+    return pairs
 
-            if expect_command:
-                cmd = os.path.basename(token)
-                commands.append(cmd)
-                expect_command = False
 
-    return commands
+def extract_commands(command_string: str) -> list[str]:
+    """Extract command names from a shell command string."""
+    return [cmd for _, cmd in _parse_command(command_string)]
 
 
 def validate_pkill_command(command_string: str) -> tuple[bool, str]:
     """Validate pkill commands - only allow killing dev-related processes."""
     allowed_process_names = {"node", "npm", "npx", "vite", "next"}
 
-    try:
-        tokens = shlex.split(command_string)
-    except ValueError:
+    tokens = _lex(command_string)
+    if tokens is None:
         return False, "Could not parse pkill command"
 
     if not tokens:
@@ -136,9 +265,8 @@ def validate_pkill_command(command_string: str) -> tuple[bool, str]:
 
 def validate_chmod_command(command_string: str) -> tuple[bool, str]:
     """Validate chmod commands - only allow making files executable with +x."""
-    try:
-        tokens = shlex.split(command_string)
-    except ValueError:
+    tokens = _lex(command_string)
+    if tokens is None:
         return False, "Could not parse chmod command"
 
     if not tokens or tokens[0] != "chmod":
@@ -158,7 +286,8 @@ def validate_chmod_command(command_string: str) -> tuple[bool, str]:
     if mode is None:
         return False, "chmod requires a mode"
 
-    if not re.match(r"^[ugoa]*\+x$", mode):
+    # Equivalent to ^[ugoa]*\+x$ as plain string operations (no regex engine entry)
+    if not (mode.endswith("+x") and not mode[:-2].strip("ugoa")):
         return False, f"chmod only allowed with +x mode, got: {mode}"
 
     return True, ""
@@ -166,9 +295,8 @@ def validate_chmod_command(command_string: str) -> tuple[bool, str]:
 
 def validate_init_script(command_string: str) -> tuple[bool, str]:
     """Validate init.sh script execution - only allow ./init.sh."""
-    try:
-        tokens = shlex.split(command_string)
-    except ValueError:
+    tokens = _lex(command_string)
+    if tokens is None:
         return False, "Could not parse init script command"
 
     if not tokens:
@@ -181,9 +309,28 @@ def validate_init_script(command_string: str) -> tuple[bool, str]:
     return False, f"Only ./init.sh is allowed, got: {script}"
 
 
-def validate_command(command: str) -> tuple[bool, str]:
+# Validator for each command in COMMANDS_NEEDING_EXTRA_VALIDATION
+_EXTRA_VALIDATORS = {
+    "pkill": validate_pkill_command,
+    "chmod": validate_chmod_command,
+    "init.sh": validate_init_script,
+}
+
+
+# A command free of these is one simple command whose name is its first space-separated word:
+# no quoting, escapes or separators, no assignments, no tabs/CRs as word breaks, and none of
+# the expansions, comments or here-documents the full parse rejects
+_FAST_PATH_EXCLUDED_CHARS = frozenset(";\n&|'\"\\=\t\r$`#(<")
+
+
+@functools.lru_cache(maxsize=1024)
+def validate_command(command: str, _allowed=ALLOWED_COMMANDS, _validators=_EXTRA_VALIDATORS,
+                     _keywords=_KEYWORDS) -> tuple[bool, str]:
     """
     Validate a bash command against security rules.
+    Results are memoized per command string (agents re-issue the same commands constantly);
+    the allowlists are frozensets, so a cached verdict cannot go stale. If validators are
+    reconfigured at runtime, call validate_command.cache_clear().
     
     Returns:
         (is_allowed, reason)
@@ -191,35 +338,29 @@ def validate_command(command: str) -> tuple[bool, str]:
     if not command:
         return False, "Empty command"
 
-    commands = extract_commands(command)
-    if not commands:
+    # Fast path for simple commands such as "ls -la" or "cat README.md": skip the full parse
+    if _FAST_PATH_EXCLUDED_CHARS.isdisjoint(command):
+        first = command.strip(" ").partition(" ")[0]
+        if first and first[0] != "-" and first not in _keywords:
+            cmd = first.rpartition("/")[2]
+            if cmd not in _allowed:
+                return False, f"Command '{cmd}' is not in the allowed commands list"
+            validator = _validators.get(cmd)
+            return validator(command) if validator else (True, "")
+
+    # Each command comes with its own segment, so extra validation needs no re-parsing
+    pairs = _parse_command(command)
+    if not pairs:
         return False, f"Could not parse command: {command}"
 
-    segments = split_command_segments(command)
-
-    for cmd in commands:
-        if cmd not in ALLOWED_COMMANDS:
+    for cmd_segment, cmd in pairs:
+        if cmd not in _allowed:
             return False, f"Command '{cmd}' is not in the allowed commands list"
 
-        if cmd in COMMANDS_NEEDING_EXTRA_VALIDATION:
-            # Find segment containing this command
-            cmd_segment = command # Fallback
-            for seg in segments:
-                if cmd in extract_commands(seg):
-                    cmd_segment = seg
-                    break
-
-            if cmd == "pkill":
-                allowed, reason = validate_pkill_command(cmd_segment)
-                if not allowed:
-                    return False, reason
-            elif cmd == "chmod":
-                allowed, reason = validate_chmod_command(cmd_segment)
-                if not allowed:
-                    return False, reason
-            elif cmd == "init.sh":
-                allowed, reason = validate_init_script(cmd_segment)
-                if not allowed:
-                    return False, reason
+        validator = _validators.get(cmd)
+        if validator:
+            allowed, reason = validator(cmd_segment)
+            if not allowed:
+                return False, reason
 
     return True, ""
@@ -0,0 +1,488 @@
+#!/usr/bin/env python3
+"""
+Security Validation Tests
+=========================
+
+Tests for the bash command security validation logic.
+Run with: python test_security.py
+"""
+
+import shlex
+import sys
+
+from security import (
+    _FAST_PATH_EXCLUDED_CHARS,
+    _lex,
+    extract_commands,
+    validate_chmod_command,
+    validate_command,
+    validate_init_script,
+    validate_pkill_command,
+)
+
+
+def check_command(command: str, should_block: bool) -> bool:
+    """Test a single command against validate_command."""
+    allowed, reason = validate_command(command)
+    was_blocked = not allowed
+
+    if was_blocked == should_block:
+        status = "PASS"
+    else:
+        status = "FAIL"
+        expected = "blocked" if should_block else "allowed"
+        actual = "blocked" if was_blocked else "allowed"
+        print(f"  {status}: {command!r}")
+        print(f"         Expected: {expected}, Got: {actual}")
+        if reason:
+            print(f"         Reason: {reason}")
+        return False
+
+    print(f"  {status}: {command!r}")
+    return True
+
+
+def check_validator(validator, test_cases) -> tuple[int, int]:
+    """Run (command, should_be_allowed, description) cases against a validator."""
+    passed = 0
+    failed = 0
+
+    for cmd, should_allow, description in test_cases:
+        allowed, reason = validator(cmd)
+        if allowed == should_allow:
+            print(f"  PASS: {cmd!r} ({description})")
+            passed += 1
+        else:
+            expected = "allowed" if should_allow else "blocked"
+            actual = "allowed" if allowed else "blocked"
+            print(f"  FAIL: {cmd!r} ({description})")
+            print(f"         Expected: {expected}, Got: {actual}")
+            if reason:
+                print(f"         Reason: {reason}")
+            failed += 1
+
+    return passed, failed
+
+
+def test_lex():
+    """Test that _lex splits words exactly like shlex.split."""
+    print("\nTesting the lexer against shlex.split:\n")
+    passed = 0
+    failed = 0
+
+    test_cases = [
+        "ls -la",
+        "  ls \t -la  ",
+        "git commit -m 'a message'",
+        'git commit -m "say \\"hi\\""',
+        'echo "a\\b" \'c\\d\'',
+        "echo a\\ b",
+        "echo '' \"\"",
+        "echo a''b",
+        "echo 'unclosed",
+        'echo "unclosed',
+        "echo trailing\\",
+    ]
+
+    for cmd in test_cases:
+        try:
+            expected = shlex.split(cmd)
+        except ValueError:
+            expected = None
+        result = _lex(cmd)
+        if result == expected:
+            print(f"  PASS: {cmd!r} -> {result}")
+            passed += 1
+        else:
+            print(f"  FAIL: {cmd!r}")
+            print(f"         Expected: {expected}, Got: {result}")
+            failed += 1
+
+    # ANSI-C quoting is refused rather than split the way shlex would
+    if _lex("ls $'a'") is None:
+        print("  PASS: \"ls $'a'\" -> None")
+        passed += 1
+    else:
+        print("  FAIL: \"ls $'a'\" should not tokenize")
+        failed += 1
+
+    return passed, failed
+
+
+def test_extract_commands():
+    """Test the command extraction logic."""
+    print("\nTesting command extraction:\n")
+    passed = 0
+    failed = 0
+
+    test_cases = [
+        ("ls -la", ["ls"]),
+        ("npm install && npm run build", ["npm", "npm"]),
+        ("cat file.txt | grep pattern", ["cat", "grep"]),
+        ("/usr/bin/node script.js", ["node"]),
+        ("VAR=value ls", ["ls"]),
+        ("git status || git init", ["git", "git"]),
+        ("ls; pwd\ngit status", ["ls", "pwd", "git"]),
+        ("npm run dev & sleep 2", ["npm", "sleep"]),
+        ("if ls; then pwd; fi", ["ls", "pwd"]),
+        ("git commit -m 'a; b && c'", ["git"]),
+        ("ls 'unclosed", []),
+    ]
+
+    for cmd, expected in test_cases:
+        result = extract_commands(cmd)
+        if result == expected:
+            print(f"  PASS: {cmd!r} -> {result}")
+            passed += 1
+        else:
+            print(f"  FAIL: {cmd!r}")
+            print(f"         Expected: {expected}, Got: {result}")
+            failed += 1
+
+    return passed, failed
+
+
+def test_validate_chmod():
+    """Test chmod command validation."""
+    print("\nTesting chmod validation:\n")
+
+    # Test cases: (command, should_be_allowed, description)
+    return check_validator(validate_chmod_command, [
+        # Allowed cases
+        ("chmod +x init.sh", True, "basic +x"),
+        ("chmod u+x init.sh", True, "user +x"),
+        ("chmod ug+x init.sh", True, "user+group +x"),
+        ("chmod +x file1.sh file2.sh", True, "multiple files"),
+        # Blocked cases
+        ("chmod 777 init.sh", False, "numeric mode"),
+        ("chmod +w init.sh", False, "write permission"),
+        ("chmod -x init.sh", False, "remove execute"),
+        ("chmod -R +x dir/", False, "recursive flag"),
+        ("chmod", False, "missing mode"),
+        ("chmod x+x init.sh", False, "invalid who"),
+    ])
+
+
+def test_validate_pkill():
+    """Test pkill command validation."""
+    print("\nTesting pkill validation:\n")
+
+    return check_validator(validate_pkill_command, [
+        # Allowed cases
+        ("pkill node", True, "basic dev process"),
+        ("pkill -f node", True, "with flag"),
+        ("pkill -f 'node server.js'", True, "full command line"),
+        ("pkill vite", True, "vite"),
+        # Blocked cases
+        ("pkill bash", False, "non-dev process"),
+        ("pkill node bash", False, "last argument is the target"),
+        ("pkill -f 'bash node'", False, "first word of the pattern is the target"),
+        ("pkill", False, "missing process name"),
+        ("pkill -9", False, "only flags"),
+    ])
+
+
+def test_validate_init_script():
+    """Test init.sh script execution validation."""
+    print("\nTesting init.sh validation:\n")
+
+    return check_validator(validate_init_script, [
+        # Allowed cases
+        ("./init.sh", True, "basic ./init.sh"),
+        ("./init.sh arg1 arg2", True, "with arguments"),
+        ("/path/to/init.sh", True, "absolute path"),
+        # Blocked cases
+        ("./setup.sh", False, "different script name"),
+        ("bash init.sh", False, "bash invocation"),
+    ])
+
+
+def test_second_command_validation():
+    """Test that extra validation applies to every command, not just the first."""
+    print("\nTesting extra validation of later commands:\n")
+    passed = 0
+    failed = 0
+
+    test_cases = [
+        ("chmod +x init.sh && ./init.sh", False),
+        ("chmod +x a.sh && chmod 777 b.sh", True),
+        ("ls; chmod -R +x dir/", True),
+        ("pkill node && pkill npm", False),
+        ("pkill node && pkill bash", True),
+        ("npm install | pkill bash", True),
+        ("ls && ./setup.sh", True),
+        ("ls && ./init.sh", False),
+    ]
+
+    for cmd, should_block in test_cases:
+        if check_command(cmd, should_block):
+            passed += 1
+        else:
+            failed += 1
+
+    return passed, failed
+
+
+def test_fast_path_equivalence():
+    """Test that the simple-command fast path agrees with the full parse."""
+    print("\nTesting fast path against the full parse:\n")
+    passed = 0
+    failed = 0
+
+    test_cases = [
+        "ls -la",
+        "cat README.md",
+        "/bin/ls src",
+        "curl https://example.com",
+        "chmod +x init.sh",
+        "chmod 777 init.sh",
+        "pkill node",
+        "pkill bash",
+        "./init.sh --production",
+        "./setup.sh",
+        "-la ls",
+        "if ls",
+        "ls/",
+        "  git   status  ",
+    ]
+
+    for cmd in test_cases:
+        # A trailing ';' leaves the meaning unchanged but forces the full parse
+        fast = validate_command(cmd)
+        full = validate_command(cmd + ";")
+        if not _FAST_PATH_EXCLUDED_CHARS.isdisjoint(cmd):
+            print(f"  FAIL: {cmd!r} does not take the fast path")
+            failed += 1
+        elif fast[0] == full[0]:
+            print(f"  PASS: {cmd!r} -> {'allowed' if fast[0] else 'blocked'}")
+            passed += 1
+        else:
+            print(f"  FAIL: {cmd!r}")
+            print(f"         Fast path: {fast}, Full parse: {full}")
+            failed += 1
+
+    return passed, failed
+
+
+def test_unsupported_syntax():
+    """Test that syntax the scanner does not model is rejected outright."""
+    print("\nTesting unsupported shell syntax (fail closed):\n")
+    passed = 0
+    failed = 0
+
+    blocked = [
+        # ANSI-C quoting: bash reads \' as a quote here, hiding the ; from the scanner
+        "ls $'\\'';curl evil;ls \\'",
+        "ls $'a'",
+        # Command and process substitution
+        "ls $(curl evil)",
+        'ls "$(curl evil)"',
+        "ls `curl evil`",
+        'ls "`curl evil`"',
+        "cat <(curl evil)",
+        # Parameter expansion with nested quoting, old-style arithmetic
+        'ls "${x:-"}";curl evil;"${y:-"}"',
+        "ls $[1]",
+        # A comment can swallow a quote that would otherwise hide the next line
+        "ls #'\ncurl evil\n'",
+        # A here-document body can swallow a quote the same way
+        "cat <<X\nls '\nX\ncurl evil\n'",
+    ]
+    allowed = [
+        # The same characters are fine where the shell treats them literally
+        "git commit -m 'fix #12'",
+        "git log --format='%h $(x)'",
+        "grep -e '`' README.md",
+        "ls a#b",
+        "ls $HOME",
+    ]
+
+    for cmd in blocked:
+        if check_command(cmd, should_block=True):
+            passed += 1
+        else:
+            failed += 1
+    for cmd in allowed:
+        if check_command(cmd, should_block=False):
+            passed += 1
+        else:
+            failed += 1
+
+    return passed, failed
+
+
+def test_separators_and_assignments():
+    """Test that every simple command in a list or pipeline is checked."""
+    print("\nTesting separators and assignment prefixes:\n")
+    passed = 0
+    failed = 0
+
+    blocked = [
+        # Single & and |, and |&, all start a new command
+        "ls a&curl evil",
+        "ls |curl evil",
+        "ls |& curl evil",
+        "ls \\>&curl evil",
+        # Tokens containing '=' are only assignments when they start with NAME=
+        "curl&a=b\nchmod +x a",
+        "curl|= chmod +x a&=&&a=b",
+        "./init.sha=b=curl\tchmod +x a&curl",
+        "pkill nodegitpkill node\t\na=brm&curl",
+        "1a=b curl evil",
+        # Newlines separate commands like ;
+        "ls\ncurl evil",
+        "ls\n\ncurl evil",
+    ]
+    allowed = [
+        # Redirections that contain & or |
+        "ls 2>&1",
+        "npm test &> out.log",
+        "ls >| out.txt",
+        "npm run build 2>&1 | tail -20",
+        # Background job and quoted operators
+        "npm run dev &",
+        "grep '|' README.md",
+        "grep 'a&b' README.md",
+        # Assignment prefixes
+        "VAR=value ls",
+        "NODE_ENV=production npm run build",
+        "A=1 B=2 node server.js",
+        "ls\ngit status",
+    ]
+
+    for cmd in blocked:
+        if check_command(cmd, should_block=True):
+            passed += 1
+        else:
+            failed += 1
+    for cmd in allowed:
+        if check_command(cmd, should_block=False):
+            passed += 1
+        else:
+            failed += 1
+
+    return passed, failed
+
+
+def main():
+    print("=" * 70)
+    print("  SECURITY VALIDATION TESTS")
+    print("=" * 70)
+
+    passed = 0
+    failed = 0
+
+    # Test the lexer
+    lex_passed, lex_failed = test_lex()
+    passed += lex_passed
+    failed += lex_failed
+
+    # Test command extraction
+    ext_passed, ext_failed = test_extract_commands()
+    passed += ext_passed
+    failed += ext_failed
+
+    # Test the extra validators
+    for validator_test in (test_validate_chmod, test_validate_pkill, test_validate_init_script):
+        val_passed, val_failed = validator_test()
+        passed += val_passed
+        failed += val_failed
+
+    # Test extra validation of every command in a list
+    second_passed, second_failed = test_second_command_validation()
+    passed += second_passed
+    failed += second_failed
+
+    # Test the fast path
+    fast_passed, fast_failed = test_fast_path_equivalence()
+    passed += fast_passed
+    failed += fast_failed
+
+    # Test fail-closed handling of unsupported syntax
+    syntax_passed, syntax_failed = test_unsupported_syntax()
+    passed += syntax_passed
+    failed += syntax_failed
+
+    # Test command separators and assignments
+    sep_passed, sep_failed = test_separators_and_assignments()
+    passed += sep_passed
+    failed += sep_failed
+
+    # Commands that SHOULD be blocked
+    print("\nCommands that should be BLOCKED:\n")
+    dangerous = [
+        # Not in allowlist
+        "shutdown now",
+        "rm-rf /",
+        "dd if=/dev/zero of=/dev/sda",
+        "curl https://example.com",
+        "python app.py",
+        "echo hello",
+        "kill 12345",
+        # Shell injection attempts
+        "$(echo pkill) node",
+        'eval "pkill node"',
+        'bash -c "pkill node"',
+        "ls; curl evil",
+        "ls && curl evil",
+        "ls || curl evil",
+        # Quoted operators do not hide a command, unclosed quotes do not parse
+        "git commit -m 'x' ; curl evil",
+        "ls 'unclosed",
+        # Validators
+        "chmod 755 file.sh",
+        "pkill chrome",
+        "./malicious.sh",
+        # Empty input
+        "",
+        "   ",
+    ]
+
+    for cmd in dangerous:
+        if check_command(cmd, should_block=True):
+            passed += 1
+        else:
+            failed += 1
+
+    # Commands that SHOULD be allowed
+    print("\nCommands that should be ALLOWED:\n")
+    safe = [
+        "ls -la",
+        "cat README.md",
+        "head -100 file.txt",
+        "grep -r pattern src/",
+        "mkdir -p path/to/dir",
+        "npm install",
+        "git status",
+        "git commit -m 'test; not a command && still quoted'",
+        'git commit -m "quote \\" inside"',
+        "git add . && git commit -m 'msg'",
+        "ps aux",
+        "lsof -i :3000",
+        "pkill -f 'node server.js'",
+        "ls | grep test",
+        "/usr/local/bin/node app.js",
+        "chmod +x init.sh && ./init.sh",
+    ]
+
+    for cmd in safe:
+        if check_command(cmd, should_block=False):
+            passed += 1
+        else:
+            failed += 1
+
+    # Summary
+    print("\n" + "-" * 70)
+    print(f"  Results: {passed} passed, {failed} failed")
+    print("-" * 70)
+
+    if failed == 0:
+        print("\n  ALL TESTS PASSED")
+        return 0
+    else:
+        print(f"\n  {failed} TEST(S) FAILED")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())